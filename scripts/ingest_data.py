@@ -1,14 +1,38 @@
-import json
+import atexit
+import functools
 import os
-from typing import Dict
+from typing import Dict, Tuple
 
+import orjson
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 load_dotenv()
 
 # API Configuration
 BASE_URL = os.getenv("INGEST_API_BASE_URL", "http://localhost:5000")
+INGEST_URL = f"{BASE_URL}/api/ingest"
+
+# Shared keep-alive session so repeated ingests reuse the TCP/TLS connection
+_SESSION = requests.Session()
+_SESSION.mount(BASE_URL, HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    # Connection failures only: the ingest POST isn't idempotent, so a 5xx or
+    # a dropped response must not be replayed
+    max_retries=Retry(total=3, backoff_factor=0.2),
+))
+atexit.register(_SESSION.close)
+
+
+@functools.lru_cache(maxsize=64)
+def _tactile_json(items: Tuple[Tuple[str, float], ...]) -> bytes:
+    """Serialize tactile data once per distinct set of values."""
+    # Multipart form fields accept bytes, so orjson's output goes out as-is
+    return orjson.dumps(dict(items))
+
 
 def ingest_to_hardware_api(
     image_path: str,
@@ -26,32 +50,32 @@ def ingest_to_hardware_api(
     """
 
     try:
-        # Read image as bytes
-        if not os.path.exists(image_path):
+        try:
+            image_file = open(image_path, "rb")
+        except FileNotFoundError:
             print("Image file not found: %s", image_path)
             return False
 
-        with open(image_path, "rb") as f:
-            image_bytes = f.read()
+        print("Sending data to hardware API at %s", INGEST_URL)
 
-        print("Sending data to hardware API at %s/api/ingest", BASE_URL)
+        # Not streamed: requests reads the whole file into the multipart body
+        # either way; passing the handle just leaves that read to requests
+        with image_file:
+            files = {
+                'image': (os.path.basename(image_path), image_file, 'image/png')
+            }
 
-        # Prepare form data
-        files = {
-            'image': (os.path.basename(image_path), image_bytes, 'image/png')
-        }
-        
-        data = {
-            'tactile_json': json.dumps(tactile_data)
-        }
-
-        # Make POST request
-        response = requests.post(
-            f"{BASE_URL}/api/ingest",
-            files=files,
-            data=data,
-            timeout=30
-        )
+            data = {
+                'tactile_json': _tactile_json(tuple(sorted(tactile_data.items())))
+            }
+
+            # Make POST request
+            response = _SESSION.post(
+                INGEST_URL,
+                files=files,
+                data=data,
+                timeout=30
+            )
 
         if response.status_code == 200:
             print("Successfully sent data to hardware API")
@@ -1,57 +1,174 @@
 #!/usr/bin/env python3
 
+import asyncio
+import functools
+import os
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional, Tuple
+
 from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 
 from seeed_dht import DHT
 from grove.display.jhd1802 import JHD1802
 
-app = FastAPI(title="Pi Sensor Service", version="0.3.0")
+app = FastAPI(title="Pi Sensor Service", version="0.3.0", default_response_class=ORJSONResponse)
 
 sensor = DHT("11", 5)
 lcd = JHD1802()
 
 data_lock = threading.Lock()
+data_cond = threading.Condition(data_lock)
 lcd_lock = threading.Lock()
 
-latest_data = {"temperature": None, "humidity": None, "timestamp": None}
+# Last lines sent to the LCD, so identical updates can skip the I2C writes.
+# None while the display contents are unknown (startup, or a failed write).
+_last_lcd: Optional[Tuple[str, str]] = None
+
+# Blocking hardware I/O runs off the event loop. Separate single-worker pools
+# so an LCD write never queues behind a slow DHT read (neither is reentrant).
+_sensor_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dht")
+_lcd_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lcd")
+
+# Set by request handlers to wake sensor_loop before its next scheduled poll
+refresh_requested = threading.Event()
+
+# Real-time placement for the bit-banged DHT reads
+SENSOR_CPU = 3
+SENSOR_RT_PRIORITY = 10
+
+# Bounded retry for flaky DHT reads
+DHT_READ_ATTEMPTS = 3
+DHT_RETRY_DELAY_S = 0.05
+
+# Longest a request will wait for sensor_loop to complete an on-demand read
+REFRESH_TIMEOUT_S = 5.0
 
+# Adaptive polling: back off while readings are steady, snap back on change
+TEMP_CHANGE_THRESHOLD_C = 0.2
+HUMI_CHANGE_THRESHOLD_PCT = 1.0
+poll_config = {"min_interval_s": 2.0, "max_interval_s": 60.0, "backoff": 1.5}
 
+
+class SensorSample(NamedTuple):
+    temperature: Optional[float]
+    humidity: Optional[float]
+    timestamp: Optional[float]
+
+
+# Replaced wholesale on every read; rebinding a global is atomic, so readers
+# take a consistent snapshot without holding data_lock
+latest = SensorSample(None, None, None)
+read_attempts = 0
+last_error = None
+
+
+@functools.lru_cache(maxsize=256)
 def _fit_16(s: str) -> str:
     s = (s or "")
     return s[:16].ljust(16)
 
 
+def _lcd_write_row(row: int, new: str, old: Optional[str]) -> None:
+    """Rewrite only the span of `row` that differs from what the LCD already shows."""
+    if old is None or len(old) != len(new):
+        start, end = 0, len(new)
+    else:
+        changed = [i for i, (a, b) in enumerate(zip(new, old)) if a != b]
+        if not changed:
+            return
+        start, end = changed[0], changed[-1] + 1
+    lcd.setCursor(row, start)
+    lcd.write(new[start:end])
+
+
 def lcd_write_16x2(line1: str, line2: str) -> None:
+    global _last_lcd
     l1, l2 = _fit_16(line1), _fit_16(line2)
     with lcd_lock:
-        lcd.setCursor(0, 0)
-        lcd.write(l1)
-        lcd.setCursor(1, 0)
-        lcd.write(l2)
+        if (l1, l2) == _last_lcd:
+            return
+        old1, old2 = _last_lcd or (None, None)
+        # Unknown display contents until both rows are rewritten
+        _last_lcd = None
+        _lcd_write_row(0, l1, old1)
+        _lcd_write_row(1, l2, old2)
+        _last_lcd = (l1, l2)
 
 
 def read_sensor_once():
-    humi, temp = sensor.read()
-    if humi is None or temp is None:
-        raise RuntimeError("DHT read returned None")
-    return humi, temp
+    # DHT11 NACKs a fair fraction of reads; retry briefly before giving up
+    for attempt in range(DHT_READ_ATTEMPTS):
+        humi, temp = sensor.read()
+        if humi is not None and temp is not None:
+            return humi, temp
+        if attempt + 1 < DHT_READ_ATTEMPTS:
+            time.sleep(DHT_RETRY_DELAY_S)
+    raise RuntimeError("DHT read returned None")
+
+
+def _pin_sensor_thread():
+    """Pin the calling thread to SENSOR_CPU under SCHED_FIFO, if permitted."""
+    # pid 0 targets the calling thread on Linux
+    try:
+        os.sched_setaffinity(0, {SENSOR_CPU})
+    except (AttributeError, OSError):
+        pass
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(SENSOR_RT_PRIORITY))
+    except (AttributeError, OSError):
+        # Needs CAP_SYS_NICE; fall back to the default scheduler
+        pass
 
 
-def sensor_loop(poll_interval=2):
+def sensor_loop():
+    global latest, read_attempts, last_error
+    _pin_sensor_thread()
+    interval = poll_config["min_interval_s"]
+    last_temp, last_humi = None, None
     while True:
+        refresh_requested.clear()
         try:
             humi, temp = read_sensor_once()
-            with data_lock:
-                latest_data["temperature"] = temp
-                latest_data["humidity"] = humi
-                latest_data["timestamp"] = time.time()
+            latest = SensorSample(temp, humi, time.time())
+            last_error = None
+            steady = (
+                last_temp is not None
+                and abs(temp - last_temp) < TEMP_CHANGE_THRESHOLD_C
+                and abs(humi - last_humi) < HUMI_CHANGE_THRESHOLD_PCT
+            )
+            if steady:
+                interval = min(poll_config["max_interval_s"], interval * poll_config["backoff"])
+            else:
+                interval = poll_config["min_interval_s"]
+            last_temp, last_humi = temp, humi
         except Exception as e:
             # Keep loop alive even if DHT flakes out
             print("Sensor read error:", e)
-        time.sleep(poll_interval)
+            last_error = e
+            interval = poll_config["min_interval_s"]
+        with data_cond:
+            read_attempts += 1
+            data_cond.notify_all()
+        refresh_requested.wait(interval)
+
+
+def _ensure_fresh(max_age_s):
+    """Wake sensor_loop and wait for its next read if the cached sample is too old."""
+    cutoff = time.time() - max_age_s
+    ts = latest.timestamp
+    if ts is not None and ts >= cutoff:
+        return
+    with data_cond:
+        # sensor_loop may have finished a read while we were taking the lock
+        if latest.timestamp is not None and latest.timestamp >= cutoff:
+            return
+        attempt = read_attempts
+        refresh_requested.set()
+        data_cond.wait_for(lambda: read_attempts != attempt, timeout=REFRESH_TIMEOUT_S)
 
 
 @app.on_event("startup")
@@ -62,25 +179,20 @@ def start_sensor_thread():
 
 
 @app.get("/temp")
-def get_temp(
+async def get_temp(
     fresh: bool = Query(False, description="If true, force a fresh sensor read now"),
     max_age_s: int = Query(10, description="Reject cached readings older than this (unless fresh=true)"),
 ):
-    # Optionally force a fresh read
-    if fresh:
-        try:
-            humi, temp = read_sensor_once()
-            with data_lock:
-                latest_data["temperature"] = temp
-                latest_data["humidity"] = humi
-                latest_data["timestamp"] = time.time()
-        except Exception as e:
-            raise HTTPException(status_code=503, detail=f"Sensor read failed: {e}")
+    # Only touch the DHT when the cache can't satisfy the request
+    loop = asyncio.get_running_loop()
+    requested_at = time.time()
+    await loop.run_in_executor(_sensor_pool, _ensure_fresh, 0 if fresh else max_age_s)
 
-    with data_lock:
-        temp = latest_data["temperature"]
-        humi = latest_data["humidity"]
-        ts = latest_data["timestamp"]
+    temp, humi, ts = latest
+    err = last_error
+
+    if fresh and (ts is None or ts < requested_at):
+        raise HTTPException(status_code=503, detail=f"Sensor read failed: {err or 'timed out'}")
 
     if temp is None or humi is None or ts is None:
         raise HTTPException(status_code=503, detail="Sensor not ready")
@@ -90,7 +202,10 @@ def get_temp(
         raise HTTPException(status_code=503, detail=f"Sensor data stale ({age:.1f}s old)")
 
     # Update LCD only when /temp is called (your requirement)
-    lcd_write_16x2(f"Temp: {temp} C", f"Humi: {humi} %")
+    # Rounded so repeated readings map onto the same cached LCD lines
+    await loop.run_in_executor(
+        _lcd_pool, lcd_write_16x2, f"Temp: {round(temp, 1)} C", f"Humi: {round(humi, 1)} %"
+    )
 
     return {
         "temperature_c": temp,
@@ -106,14 +221,34 @@ class LCDPayload(BaseModel):
 
 
 @app.post("/lcd")
-def post_lcd(payload: LCDPayload):
+async def post_lcd(payload: LCDPayload):
     try:
-        lcd_write_16x2(payload.line1, payload.line2)
+        await asyncio.get_running_loop().run_in_executor(
+            _lcd_pool, lcd_write_16x2, payload.line1, payload.line2
+        )
         return {"ok": True, "written": {"line1": _fit_16(payload.line1), "line2": _fit_16(payload.line2)}}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"LCD write failed: {e}")
 
 
+class PollConfigPayload(BaseModel):
+    min_interval_s: float = Field(default=2.0, gt=0)
+    max_interval_s: float = Field(default=60.0, gt=0)
+    backoff: float = Field(default=1.5, ge=1.0)
+
+
+@app.post("/config")
+def post_config(payload: PollConfigPayload):
+    # Partial updates: fields left out of the request keep their current value
+    merged = {**poll_config, **payload.model_dump(exclude_unset=True)}
+    if merged["max_interval_s"] < merged["min_interval_s"]:
+        raise HTTPException(status_code=422, detail="max_interval_s must be >= min_interval_s")
+    poll_config.update(merged)
+    # Apply the new bounds immediately rather than after the current backoff sleep
+    refresh_requested.set()
+    return {"ok": True, "config": poll_config}
+
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
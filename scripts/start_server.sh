@@ -1 +1 @@
-uvicorn sensor_service:app --host 0.0.0.0 --port 8080
+uvicorn sensor_service:app --host 0.0.0.0 --port 8080 --workers 1 --loop uvloop --http httptools --no-access-log
@@ -8,19 +8,22 @@ Captures multi-modal texture data including:
 - Material analysis via Gemini API
 """
 import atexit
-import base64
+import concurrent.futures
 import enum
+import functools
 import json
 import logging
+import math
 import os
 import re
+import shlex
 import subprocess
 import threading
 import time
-import uuid
-from dataclasses import dataclass, asdict
+import wave
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 # Configure logging first (needed for import warnings)
 logging.basicConfig(
@@ -32,25 +35,26 @@ log = logging.getLogger("scan")
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
     REQUESTS_AVAILABLE = True
 except ImportError:
     REQUESTS_AVAILABLE = False
     log.warning("requests library not installed. Install with: pip install requests")
 
 import RPi.GPIO as GPIO
+import anyio
 import board
 import neopixel_spi as neopixel
+import numpy as np
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, ORJSONResponse
 from grove.display.jhd1802 import JHD1802
 from grove.grove_ryb_led_button import GroveLedButton
 from libcamera import controls
 from picamera2 import Picamera2
 from pydantic import BaseModel, Field
 
-# Configure GPIO before other hardware initialization
-GPIO.setmode(GPIO.BCM)
-GPIO.setwarnings(False)
-
 # Global controller instance (set after initialization)
 _controller: Optional['ScanController'] = None
 
@@ -91,13 +95,21 @@ except ImportError:
     GEMINI_API_KEY = None
     log.warning("google-genai not installed. Install with: pip install google-genai")
 
-# Optional PIL import for image generation
+# Optional PIL import for spectrogram rendering
 try:
-    from PIL import Image
+    from PIL import Image, ImageOps
     PIL_AVAILABLE = True
 except ImportError:
     PIL_AVAILABLE = False
-    log.warning("PIL/Pillow not installed. Image generation will be disabled. Install with: pip install Pillow")
+    log.warning("PIL/Pillow not installed. Spectrogram will fall back to sox. Install with: pip install Pillow")
+
+# Optional orjson import for faster JSON encode/decode
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    log.warning("orjson not installed; falling back to json. Install with: pip install orjson")
 
 
 # ============================================================================
@@ -118,13 +130,24 @@ MAX_BRIGHTNESS = 0.2
 
 # Timing constants (seconds)
 LED_COLOR_SETTLE_TIME = 0.8  # Time for LED to change colors (0.6-1.0 sec)
-PHOTO_CAPTURE_DELAY = 0.8  # Gap between photo captures
 POSITION_ITEM_COUNTDOWN = 3  # Seconds to position item
 TEXTURE_COUNTDOWN = 5  # Seconds before texture capture starts
 TEXTURE_RECORDING_DURATION = 3  # Seconds of audio recording
-CAMERA_SETTLE_TIME = 1.0  # Camera initialization settle time
-AUTO_FOCUS_DELAY = 0.5  # Auto focus trigger delay
-EXPOSURE_SETTLE_TIME = 0.6  # Exposure/AWB settle time
+AUTO_FOCUS_DELAY = 0.5  # Longest wait for an auto focus cycle
+EXPOSURE_SETTLE_TIME = 0.6  # Longest wait for exposure/AWB to settle
+SETTLE_MIN_FRAMES = 2  # Frames to see after re-enabling AE/AWB before trusting them
+SETTLE_TOLERANCE = 0.02  # Max relative frame-to-frame change once AE/AWB have settled
+SHUTDOWN_JOIN_TIMEOUT = 2.0  # Max wait for a running scan to clean up on exit
+CLICK_DEBOUNCE_S = 0.3  # Button clicks closer together than this are ignored
+LABEL_TIMEOUT_S = 120  # How long a scan waits for its label before going on unlabeled
+ANALYSIS_HISTORY = 5  # Finished scans kept in the status' per-scan analysis map
+ANALYSIS_FINISHED_STATES = ("DONE", "FAILED")
+
+# Gemini configuration
+# Start product image generation alongside the analysis call instead of after
+# it. Faster, but the image prompt then only has the label, not the analyzed
+# material, so it's off by default.
+GEMINI_OVERLAP_IMAGE_GENERATION = False
 
 # Audio configuration
 AUDIO_DEVICE = "hw:2,0"
@@ -132,6 +155,18 @@ AUDIO_RATE = 44100
 AUDIO_CHANNELS = 1
 AUDIO_FORMAT = "S16_LE"
 AUDIO_NORMALIZE_PEAK_DB = -6.0  # dBFS for normalization
+AUDIO_DC_GAIN_DB = -1.0  # Headroom applied alongside DC removal
+AUDIO_HIGHPASS_HZ = 20.0  # DC/drift removal cutoff
+AUDIO_SAMPLE_WIDTH = 2  # Bytes per S16_LE sample
+AUDIO_FULL_SCALE = 32768.0
+# Real-time placement for arecord; CPU 3 is left to the sensor service's DHT thread
+AUDIO_CAPTURE_CPU = 2
+AUDIO_CAPTURE_RT_PRIORITY = 20
+
+# Spectrogram configuration
+SPECTROGRAM_NPERSEG = 1024  # FFT window length (samples)
+SPECTROGRAM_HOP = 256  # Samples between successive windows
+SPECTROGRAM_DYNAMIC_RANGE_DB = 120.0  # Same floor as sox's default -z 120
 
 # Storage
 SCAN_ROOT = "./scans"
@@ -139,8 +174,25 @@ SCAN_ROOT = "./scans"
 # API Configuration
 BASE_URL = os.getenv("INGEST_API_BASE_URL", "http://localhost:5000")
 
+# Keep-alive session so ingest calls reuse pooled connections
+_HTTP: Optional["requests.Session"] = None
+if REQUESTS_AVAILABLE:
+    _HTTP = requests.Session()
+    _HTTP.mount(BASE_URL, HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=2, backoff_factor=0.2),
+    ))
+    atexit.register(_HTTP.close)
+
 # Camera configuration
 CAMERA_RESOLUTION = (1920, 1080)
+# Analysis-only photos come from a lores stream; only the product-image
+# source (candlelight) needs the full main stream.
+CAMERA_LORES_RESOLUTION = (960, 540)
+HERO_PHOTO_NAME = "candlelight"
+
+RING_OFF = (0, 0, 0)  # Ring color when the light is off
 
 # Lighting schedule: (RGB tuple, filename, display_name, color_temp_K)
 LIGHTING_SCHEDULE: List[Tuple[Tuple[int, int, int], str, str, int]] = [
@@ -152,14 +204,11 @@ LIGHTING_SCHEDULE: List[Tuple[Tuple[int, int, int], str, str, int]] = [
 ]
 
 # Filename constants - generated from lighting schedule
+@functools.lru_cache(maxsize=None)
 def _get_photo_filename(name: str) -> str:
     """Generate photo filename from lighting name."""
     return f"photo_{name}.jpg"
 
-def _get_photo_meta_filename(name: str) -> str:
-    """Generate photo metadata filename from lighting name."""
-    return f"photo_{name}.meta.json"
-
 # Photo filenames (for backward compatibility and direct access)
 PHOTO_CANDLELIGHT = _get_photo_filename("candlelight")
 PHOTO_WARM_INDOOR = _get_photo_filename("warm_indoor")
@@ -167,12 +216,8 @@ PHOTO_NEUTRAL_WHITE = _get_photo_filename("neutral_white")
 PHOTO_DIRECT_SUNLIGHT = _get_photo_filename("direct_sunlight")
 PHOTO_OVERCAST = _get_photo_filename("overcast")
 
-# Photo metadata filenames
-PHOTO_META_CANDLELIGHT = _get_photo_meta_filename("candlelight")
-PHOTO_META_WARM_INDOOR = _get_photo_meta_filename("warm_indoor")
-PHOTO_META_NEUTRAL_WHITE = _get_photo_meta_filename("neutral_white")
-PHOTO_META_DIRECT_SUNLIGHT = _get_photo_meta_filename("direct_sunlight")
-PHOTO_META_OVERCAST = _get_photo_meta_filename("overcast")
+# Capture metadata + locked controls for every photo, keyed by lighting name
+PHOTO_METADATA_JSON = "photo_metadata.json"
 
 # Audio filenames
 AUDIO_TEXTURE_RAW = "audio_texture_raw.wav"
@@ -189,96 +234,190 @@ GENERATED_PRODUCT_IMAGE = "generated_product.png"
 METADATA_LABEL_TXT = "metadata_label.txt"
 METADATA_LABEL_JSON = "metadata_label.json"
 
+# Precompiled regex patterns
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+_JSON_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*```\s*$", re.DOTALL | re.IGNORECASE)
 
-app = FastAPI(title="Hackathon Capture Service", version="0.1.0")
 
-def get_stat(parsed: Dict[str, Any], key: str) -> Any:
-    """
-    Safe lookup for SoX stat keys that may contain weird spacing.
-    
-    Args:
-        parsed: Dictionary of parsed SoX statistics
-        key: Key to look up
-        
-    Returns:
-        Value from dictionary, or None if not found
-    """
-    return parsed.get(key) or parsed.get(re.sub(r"\s+", " ", key))
+app = FastAPI(
+    title="Hackathon Capture Service",
+    version="0.1.0",
+    # /scan/status is polled; serialize responses on orjson's C path when we can
+    default_response_class=ORJSONResponse if ORJSON_AVAILABLE else JSONResponse,
+)
+
+# Directories already created by ensure_dir in this process
+_dirs_created: set = set()
+_dirs_created_lock = threading.Lock()
 
 
 def ensure_dir(path: str) -> None:
-    """Create directory if it doesn't exist."""
-    os.makedirs(path, exist_ok=True)
+    """Create directory if it doesn't exist (once per process per path)."""
+    # abspath, not realpath: realpath would lstat every component
+    abs_path = os.path.abspath(path)
+    if abs_path in _dirs_created:
+        return
+    with _dirs_created_lock:
+        os.makedirs(abs_path, exist_ok=True)
+        _dirs_created.add(abs_path)
+
+
+def json_dumpb(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes, via orjson when available."""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=json_safe, option=option)
+    return json.dumps(obj, indent=2 if indent else None, default=json_safe).encode()
+
+
+def json_dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize to a JSON string, via orjson when available."""
+    if ORJSON_AVAILABLE:
+        return json_dumpb(obj, indent).decode()
+    return json.dumps(obj, indent=2 if indent else None, default=json_safe)
+
+
+def json_loads(text: str) -> Any:
+    """Parse JSON text, via orjson when available (raises json.JSONDecodeError)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def write_json_atomic(path: str, obj: Any, indent: bool = True) -> None:
+    """Write JSON beside `path` and rename it into place, so readers never see a partial file."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(json_dumpb(obj, indent=indent))
+    os.replace(tmp, path)
 
 
 def clamp(value: float, min_val: float, max_val: float) -> float:
     """Clamp a value between min and max."""
     return max(min_val, min(max_val, value))
 
-def run_cmd(cmd: List[str], *, timeout: Optional[int] = None) -> str:
-    log.info("CMD start: %s", " ".join(cmd))
+def run_cmd(cmd: List[str], *, timeout: Optional[int] = None) -> bytes:
+    cmd_str = shlex.join(cmd)
+    # Start/ok are per-subprocess chatter; failures still surface below
+    log.debug("CMD start: %s", cmd_str)
     try:
         p = subprocess.run(
             cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,
             timeout=timeout,
             check=False,   # IMPORTANT: don't raise automatically
         )
-        out = (p.stdout or "").strip()
-        if out:
-            log.info("CMD output:\n%s", out)
+        # Raw bytes; only decoded when someone is going to read them
+        out = (p.stdout or b"").strip()
+        if out and log.isEnabledFor(logging.INFO):
+            log.info("CMD output:\n%s", out.decode("utf-8", "replace"))
         if p.returncode != 0:
-            raise RuntimeError(f"Command failed rc={p.returncode}: {' '.join(cmd)}")
-        log.info("CMD ok: %s", " ".join(cmd))
+            raise RuntimeError(f"Command failed rc={p.returncode}: {cmd_str}")
+        log.debug("CMD ok: %s", cmd_str)
         return out
     except Exception as e:
         log.exception("CMD exception: %s", e)
         raise
 
 
+_PAD16 = " " * 16
+
+
 def _fit_16(s: str) -> str:
-    s = (s or "")
-    return s[:16].ljust(16)
+    return ((s or "") + _PAD16)[:16]
 
 
-def json_safe(obj):
-    """Convert libcamera / numpy / enum-rich structures into JSON-serializable types."""
-    if obj is None or isinstance(obj, (str, int, float, bool)):
-        return obj
+def _json_safe_list(obj):
+    return [json_safe(x) for x in obj]
+
+
+def _json_safe_dict(obj):
+    return {str(k): json_safe(v) for k, v in obj.items()}
+
+
+def _json_safe_scalar(obj):
+    return obj
+
+
+# Exact-type dispatch for json_safe; other types are resolved once and added
+_JSON_SAFE_HANDLERS = {
+    type(None): _json_safe_scalar,
+    str: _json_safe_scalar,
+    int: _json_safe_scalar,
+    float: _json_safe_scalar,
+    bool: _json_safe_scalar,
+    list: _json_safe_list,
+    tuple: _json_safe_list,
+    dict: _json_safe_dict,
+}
+
+
+def _json_safe_enum(obj):
+    return obj.name  # or obj.value
+
+
+def _json_safe_numpy(obj):
+    return obj.item()
+
+
+def _resolve_json_safe_handler(cls: type):
+    """Pick the json_safe handler for a type missing from _JSON_SAFE_HANDLERS."""
+    if issubclass(cls, (str, int, float, bool)):
+        return _json_safe_scalar
 
     # libcamera enums are Python Enums
-    if isinstance(obj, enum.Enum):
-        return obj.name  # or obj.value
+    if issubclass(cls, enum.Enum):
+        return _json_safe_enum
 
     # common tuple/list containers
-    if isinstance(obj, (list, tuple)):
-        return [json_safe(x) for x in obj]
+    if issubclass(cls, (list, tuple)):
+        return _json_safe_list
 
     # dict-like
-    if isinstance(obj, dict):
-        return {str(k): json_safe(v) for k, v in obj.items()}
+    if issubclass(cls, dict):
+        return _json_safe_dict
 
     # numpy scalars (if any show up)
-    try:
-        import numpy as np
-        if isinstance(obj, np.generic):
-            return obj.item()
-    except Exception:
-        pass
+    if issubclass(cls, np.generic):
+        return _json_safe_numpy
 
     # fallback: string representation
-    return str(obj)
+    return str
 
 
-def record_audio_wav(out_wav: str, duration_s: int = TEXTURE_RECORDING_DURATION) -> None:
+def json_safe(obj):
+    """Convert libcamera / numpy / enum-rich structures into JSON-serializable types."""
+    cls = type(obj)
+    handler = _JSON_SAFE_HANDLERS.get(cls)
+    if handler is None:
+        # Resolve each new type (e.g. a libcamera enum) once, then it takes the fast path
+        handler = _JSON_SAFE_HANDLERS[cls] = _resolve_json_safe_handler(cls)
+    return handler(obj)
+
+
+def _prioritize_audio_capture(pid: int) -> None:
+    """Pin the capture process to AUDIO_CAPTURE_CPU under SCHED_FIFO, if permitted."""
+    try:
+        os.sched_setaffinity(pid, {AUDIO_CAPTURE_CPU})
+    except (AttributeError, OSError):
+        pass
+    try:
+        os.sched_setscheduler(pid, os.SCHED_FIFO, os.sched_param(AUDIO_CAPTURE_RT_PRIORITY))
+    except (AttributeError, OSError):
+        # Needs CAP_SYS_NICE; fall back to the default scheduler
+        pass
+
+
+def record_audio_pcm(duration_s: int = TEXTURE_RECORDING_DURATION) -> np.ndarray:
     """
-    Record audio using arecord.
+    Record audio with arecord straight into memory.
     
     Args:
-        out_wav: Output WAV file path
         duration_s: Recording duration in seconds
+        
+    Returns:
+        Recorded samples as an int16 array
     """
     cmd = [
         "arecord",
@@ -287,76 +426,198 @@ def record_audio_wav(out_wav: str, duration_s: int = TEXTURE_RECORDING_DURATION)
         "-r", str(AUDIO_RATE),
         "-c", str(AUDIO_CHANNELS),
         "-d", str(duration_s),
-        out_wav,
+        "-t", "raw",
+        "-q",
+        "-",
     ]
     log.info("Recording texture audio: %s", " ".join(cmd))
-    run_cmd(cmd)
+    # Read straight into the final array instead of letting communicate()
+    # collect and join the stdout chunks
+    samples = np.empty(duration_s * AUDIO_RATE * AUDIO_CHANNELS, dtype="<i2")
+    view = memoryview(samples).cast("B")
+    got = 0
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as p:
+        _prioritize_audio_capture(p.pid)
+        while got < len(view):
+            n = p.stdout.readinto(view[got:])
+            if not n:
+                break
+            got += n
+        err = p.stderr.read()
+        rc = p.wait()
+    if rc != 0:
+        raise RuntimeError(f"arecord failed rc={rc}: {err.decode(errors='replace').strip()}")
+    return samples[:got // AUDIO_SAMPLE_WIDTH]
+
+
+def pcm_to_float(samples: np.ndarray) -> np.ndarray:
+    """Scale int16 PCM to floats in [-1, 1)."""
+    return samples.astype(np.float64) / AUDIO_FULL_SCALE
+
+
+def float_to_pcm(x: np.ndarray) -> np.ndarray:
+    """Scale floats in [-1, 1) back to clipped int16 PCM."""
+    return np.clip(np.round(x * AUDIO_FULL_SCALE), -AUDIO_FULL_SCALE, AUDIO_FULL_SCALE - 1).astype("<i2")
+
+
+def write_wav(path: str, samples: np.ndarray) -> None:
+    """Write int16 samples as a WAV file using the capture format."""
+    with wave.open(path, "wb") as w:
+        w.setnchannels(AUDIO_CHANNELS)
+        w.setsampwidth(AUDIO_SAMPLE_WIDTH)
+        w.setframerate(AUDIO_RATE)
+        w.writeframes(samples.tobytes())
+
+
+def remove_dc(
+    x: np.ndarray,
+    gain_db: float = AUDIO_DC_GAIN_DB,
+    cutoff_hz: float = AUDIO_HIGHPASS_HZ,
+) -> np.ndarray:
+    """
+    High-pass the signal (removing DC and slow drift) and apply headroom gain.
+    
+    Zero-phase, done in the frequency domain over the whole clip, so it
+    replaces sox's `gain -1 highpass 20` without scipy.
+    
+    Args:
+        x: Samples in [-1, 1)
+        gain_db: Gain applied alongside the filter
+        cutoff_hz: Frequencies below this are removed
+        
+    Returns:
+        Filtered samples
+    """
+    if x.size == 0:
+        return x
+    spectrum = np.fft.rfft(x)
+    spectrum[np.fft.rfftfreq(x.size, d=1 / AUDIO_RATE) < cutoff_hz] = 0
+    return np.fft.irfft(spectrum, n=x.size) * (10 ** (gain_db / 20))
 
 
-def sox_remove_dc(in_wav: str, out_wav: str) -> str:
-    cmd = ["sox", in_wav, out_wav, "gain", "-1", "highpass", "20"]
-    return run_cmd(cmd)
+def peak_gain(peak: float, peak_db: float = AUDIO_NORMALIZE_PEAK_DB) -> float:
+    """Gain that brings a signal peaking at `peak` to `peak_db` dBFS (1.0 for silence)."""
+    return 10 ** (peak_db / 20) / peak if peak else 1.0
 
 
-def sox_stat(wav_path: str) -> Dict[str, Any]:
-    out = run_cmd(["sox", wav_path, "-n", "stat"])
-    parsed = {}
+def audio_stats(x: np.ndarray) -> Dict[str, Any]:
+    """
+    Compute the same statistics `sox -n stat` reports, in one pass over memory.
+    
+    Args:
+        x: Samples in [-1, 1)
+        
+    Returns:
+        {"raw": sox-style text report, "parsed": {stat name: value}}
+    """
+    n = int(x.size)
+    if n == 0:
+        return {"raw": "", "parsed": {"Samples read": 0}}
+
+    if n > 1:
+        delta = np.diff(x)
+        np.abs(delta, out=delta)
+    else:
+        delta = np.zeros(1)
+    max_amp = float(x.max())
+    min_amp = float(x.min())
+    # dot() sums the squares without materialising x * x
+    rms_amp = float(np.sqrt(np.dot(x, x) / n))
+    rms_delta = float(np.sqrt(np.dot(delta, delta) / delta.size))
+    peak = max(max_amp, -min_amp)
+
+    parsed = {
+        "Samples read": n,
+        "Length (seconds)": n / AUDIO_RATE / AUDIO_CHANNELS,
+        "Scaled by": 2147483647.0,
+        "Maximum amplitude": max_amp,
+        "Minimum amplitude": min_amp,
+        "Midline amplitude": (max_amp + min_amp) / 2,
+        "Mean norm": float(np.mean(np.abs(x))),
+        "Mean amplitude": float(x.mean()),
+        "RMS amplitude": rms_amp,
+        "Maximum delta": float(delta.max()),
+        "Minimum delta": float(delta.min()),
+        "Mean delta": float(delta.mean()),
+        "RMS delta": rms_delta,
+        "Rough frequency": int(rms_delta / rms_amp * AUDIO_RATE / (2 * np.pi)) if rms_amp else 0,
+        "Volume adjustment": 1 / peak if peak else 0.0,
+    }
+    return {"raw": _format_stats(parsed), "parsed": parsed}
+
+
+# audio_stats() fields proportional to the signal level; the rest don't change with gain
+_LINEAR_STATS = (
+    "Maximum amplitude", "Minimum amplitude", "Midline amplitude", "Mean norm",
+    "Mean amplitude", "RMS amplitude", "Maximum delta", "Minimum delta",
+    "Mean delta", "RMS delta",
+)
 
-    for line in out.splitlines():
-        if ":" not in line:
-            continue
 
-        key, val = line.split(":", 1)
+def _format_stats(parsed: Dict[str, Any]) -> str:
+    return "\n".join(f"{key + ':':<22}{val}" for key, val in parsed.items())
 
-        # Collapse any crazy whitespace to a single space
-        key = re.sub(r"\s+", " ", key.strip())
 
-        # Take the first token of the value (numeric)
-        val = val.strip().split()[0]
-        try:
-            val = float(val)
-        except ValueError:
-            pass
+def scale_audio_stats(stats: Dict[str, Any], gain: float) -> Dict[str, Any]:
+    """
+    Derive audio_stats(x * gain) from audio_stats(x) without another pass over x.
+    
+    Args:
+        stats: Result of audio_stats() for the unscaled signal
+        gain: Linear gain applied to the signal
+        
+    Returns:
+        Stats in the same shape as audio_stats()
+    """
+    parsed = dict(stats["parsed"])
+    for key in _LINEAR_STATS:
+        if key in parsed:
+            parsed[key] *= gain
+    if parsed.get("Volume adjustment"):
+        parsed["Volume adjustment"] /= gain
+    return {"raw": _format_stats(parsed), "parsed": parsed}
 
-        parsed[key] = val
 
-    return {"raw": out, "parsed": parsed}
+def sox_spectrogram(in_wav: str, out_png: str) -> bytes:
+    return run_cmd(["sox", in_wav, "-n", "spectrogram", "-o", out_png])
 
 
-def sox_spectrogram(in_wav: str, out_png: str) -> str:
-    return run_cmd(["sox", in_wav, "-n", "spectrogram", "-o", out_png])
+# Hann window shared by every spectrogram instead of rebuilt per scan
+_SPECTROGRAM_WINDOW = np.hanning(SPECTROGRAM_NPERSEG)
 
 
-def sox_normalize(
-    in_wav: str, 
-    out_wav: str, 
-    peak_db: float = AUDIO_NORMALIZE_PEAK_DB
-) -> str:
+def spectrogram_db(x: np.ndarray) -> np.ndarray:
     """
-    Normalize audio so peak is at `peak_db` dBFS (negative value).
-    -6 dBFS gives good headroom.
+    Short-time power spectrum of `x` in dB.
     
     Args:
-        in_wav: Input WAV file path
-        out_wav: Output WAV file path
-        peak_db: Target peak level in dBFS
+        x: Samples in [-1, 1)
         
     Returns:
-        Command output
+        Array of shape (frequency bins, frames), lowest frequency first
     """
-    cmd = [
-        "sox",
-        in_wav,
-        out_wav,
-        "norm",
-        str(peak_db),
-    ]
-    return run_cmd(cmd)
+    if x.size < SPECTROGRAM_NPERSEG:
+        x = np.pad(x, (0, SPECTROGRAM_NPERSEG - x.size))
+    frames = np.lib.stride_tricks.sliding_window_view(x, SPECTROGRAM_NPERSEG)[::SPECTROGRAM_HOP]
+    power = np.abs(np.fft.rfft(frames * _SPECTROGRAM_WINDOW, axis=1)) ** 2
+    return 10 * np.log10(power + 1e-12).T
+
+
+def render_spectrogram(x: np.ndarray, out_png: str) -> None:
+    """Render a heat-map spectrogram PNG (time across, frequency up) with PIL."""
+    db = spectrogram_db(x)
+    floor = db.max() - SPECTROGRAM_DYNAMIC_RANGE_DB
+    levels = (np.clip(db, floor, None) - floor) * (255 / SPECTROGRAM_DYNAMIC_RANGE_DB)
+    gray = Image.fromarray(np.flipud(levels).astype(np.uint8), mode="L")
+    ImageOps.colorize(gray, black="black", mid="red", white="yellow").save(out_png)
 
 
 def init_camera() -> Picamera2:
     """
     Initialize and configure the Raspberry Pi camera.
+
+    Called once when the controller is built; captures reuse this still
+    configuration and only adjust controls, never re-configure.
     
     Returns:
         Configured Picamera2 instance
@@ -365,6 +626,14 @@ def init_camera() -> Picamera2:
 
     cfg = cam.create_still_configuration(
         main={"size": CAMERA_RESOLUTION},
+        # Pi 5 allows an RGB lores stream, so it can be saved as JPEG directly
+        lores={"size": CAMERA_LORES_RESOLUTION, "format": "BGR888"},
+        # No queued frame: every capture_metadata()/capture_request() waits for
+        # a frame started after the call, so nothing exposed under the previous
+        # LED color comes back. Two buffers so the sensor keeps streaming into
+        # one while the other is held by the background JPEG encode.
+        buffer_count=2,
+        queue=False,
         controls={
             "AeEnable": True,
             "AwbEnable": True,
@@ -372,18 +641,96 @@ def init_camera() -> Picamera2:
         },
     )
     cam.configure(cfg)
+    # No settle sleep: every capture waits for AE/AWB/AF convergence itself
     cam.start()
-    time.sleep(CAMERA_SETTLE_TIME)
 
-    log.info("Camera initialized (still, %dx%d)", *CAMERA_RESOLUTION)
+    log.info("Camera initialized (still, %dx%d, lores %dx%d)",
+             *CAMERA_RESOLUTION, *CAMERA_LORES_RESOLUTION)
     return cam
 
 
+def save_request(request: Any, path: str, stream: str = "main") -> None:
+    """Encode and write a captured request, then hand its buffer back to the camera."""
+    # picamera2 already encodes with simplejpeg and writes the file in one pass
+    try:
+        request.save(stream, path)
+    finally:
+        request.release()
+
+
+def write_photo_metadata(path: str, photo_meta: Dict[str, Dict[str, Any]]) -> None:
+    """Write the capture metadata of all photos in one file; failures are only logged."""
+    try:
+        # Machine-read only, and the largest file; compact roughly halves it
+        write_json_atomic(path, photo_meta, indent=False)
+    except Exception as e:
+        log.warning("Failed to write metadata JSON: %s", e)
+
+
+def _nearly_equal(a: Any, b: Any) -> bool:
+    if a is None or b is None:
+        return a is b
+    if isinstance(a, (tuple, list)):
+        return len(a) == len(b) and all(map(_nearly_equal, a, b))
+    return abs(a - b) <= SETTLE_TOLERANCE * max(abs(a), abs(b))
+
+
+def wait_for_settle(cam: Picamera2, timeout_s: float, focus: bool = False) -> Dict[str, Any]:
+    """
+    Read frame metadata until AE/AWB (and optionally AF) have settled.
+    
+    AE counts as settled when it reports AeLocked, or when exposure, gain and
+    colour gains stop moving between frames. With the unqueued camera config
+    every frame here was started after the call.
+    
+    Args:
+        cam: Picamera2 instance
+        timeout_s: Upper bound on the wait; 0 returns the next frame's metadata
+        focus: Also wait for the running AF cycle to finish
+        
+    Returns:
+        Metadata of the last frame read
+    """
+    deadline = time.monotonic() + timeout_s
+    prev = None
+    frames = 0
+    # The trigger lands a few frames late; until the cycle is seen scanning,
+    # a Focused state is left over from the previous one
+    af_scanned = False
+    while True:
+        md = cam.capture_metadata()
+        frames += 1
+        af_state = md.get("AfState")
+        af_scanned = af_scanned or af_state == controls.AfStateEnum.Scanning
+        if time.monotonic() >= deadline:
+            return md
+        if frames < SETTLE_MIN_FRAMES:
+            prev = md
+            continue
+        if "AeLocked" in md:
+            ae_ok = bool(md["AeLocked"])
+        else:
+            ae_ok = prev is not None and all(
+                _nearly_equal(md.get(k), prev.get(k))
+                for k in ("ExposureTime", "AnalogueGain")
+            )
+        awb_ok = prev is not None and _nearly_equal(md.get("ColourGains"), prev.get("ColourGains"))
+        af_ok = not focus or (af_scanned and af_state in (
+            controls.AfStateEnum.Focused, controls.AfStateEnum.Failed
+        ))
+        if ae_ok and awb_ok and af_ok:
+            return md
+        prev = md
+
+
 def capture_locked(
     cam: Picamera2, 
     path: str, 
-    settle_s: float = EXPOSURE_SETTLE_TIME
-) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    settle_s: float = EXPOSURE_SETTLE_TIME,
+    writer: Optional[concurrent.futures.Executor] = None,
+    lens_position: Optional[float] = None,
+    stream: str = "main",
+) -> Tuple[Dict[str, Any], Dict[str, Any], Optional[concurrent.futures.Future]]:
     """
     Capture an image with locked exposure, white balance, and focus.
     
@@ -391,28 +738,34 @@ def capture_locked(
         cam: Picamera2 instance
         path: Output file path
         settle_s: Time to wait for exposure/AWB to settle
+        writer: If given, JPEG encode + write runs here instead of inline
+        lens_position: Focus to reuse from an earlier shot; None runs an AF cycle
+        stream: Camera stream to save ("main" full res, "lores" downscaled)
         
     Returns:
-        Tuple of (metadata, lock_controls)
+        Tuple of (metadata, lock_controls, pending save or None if written inline)
     """
-    # Let AE/AWB settle on current lighting
-    cam.set_controls({
-        "AeEnable": True, 
-        "AwbEnable": True, 
-        "AfMode": controls.AfModeEnum.Continuous
-    })
-    time.sleep(settle_s)
-
-    # Trigger AF once (more deterministic than hoping continuous AF is done)
-    cam.set_controls({
-        "AfMode": controls.AfModeEnum.Auto, 
-        "AfTrigger": controls.AfTriggerEnum.Start
-    })
-    time.sleep(AUTO_FOCUS_DELAY)
-
-    # 3) Read metadata and lock exposure + white balance + focus
-    md = cam.capture_metadata()
-
+    # Let AE/AWB settle on current lighting. Focus runs during the same wait:
+    # either one AF cycle (more deterministic than hoping continuous AF is done)
+    # or, when the item hasn't moved, the lens position from an earlier shot.
+    if lens_position is None:
+        cam.set_controls({
+            "AeEnable": True, 
+            "AwbEnable": True, 
+            "AfMode": controls.AfModeEnum.Auto, 
+            "AfTrigger": controls.AfTriggerEnum.Start
+        })
+        md = wait_for_settle(cam, max(settle_s, AUTO_FOCUS_DELAY), focus=True)
+    else:
+        cam.set_controls({
+            "AeEnable": True, 
+            "AwbEnable": True, 
+            "AfMode": controls.AfModeEnum.Manual, 
+            "LensPosition": lens_position
+        })
+        md = wait_for_settle(cam, settle_s)
+
+    # 3) Lock exposure + white balance + focus at the settled frame's values
     lock = {}
 
     # Lock exposure: use whatever AE decided
@@ -434,18 +787,30 @@ def capture_locked(
 
     cam.set_controls(lock)
 
-    # 4) Capture
-    cam.capture_file(path)
-    return md, lock
+    # 4) Capture; encoding the frame can overlap whatever the caller does next
+    request = cam.capture_request()
+    if writer is None:
+        save_request(request, path, stream)
+        return md, lock, None
+    return md, lock, writer.submit(save_request, request, path, stream)
 
 
-@dataclass
+@dataclass(frozen=True)
 class ScanStatus:
+    # Immutable once published: updates replace() the whole object
     state: str = "IDLE"
     scan_id: Optional[str] = None
     started_at: Optional[float] = None
     message: str = ""
     progress: float = 0.0
+    # Post-processing and analysis run after the capture is released, so they're
+    # tracked apart, per scan: a new scan can queue while an older one is still
+    # being analyzed. scan_id -> state; replaced, never mutated, on each change.
+    analysis: Dict[str, str] = field(default_factory=dict)
+
+
+class ScanCancelled(Exception):
+    """Raised inside a scan when the user cancels it with a long press."""
 
 
 class LabelPayload(BaseModel):
@@ -454,6 +819,34 @@ class LabelPayload(BaseModel):
     tags: Optional[list[str]] = None
 
 
+_genai_client: Optional["genai.Client"] = None
+_genai_client_lock = threading.Lock()
+
+
+def _get_genai_client() -> "genai.Client":
+    """Return the shared Gemini client, creating it on first use."""
+    global _genai_client
+    if _genai_client is None:
+        with _genai_client_lock:
+            if _genai_client is None:
+                _genai_client = genai.Client(api_key=GEMINI_API_KEY)
+    return _genai_client
+
+
+# Runs product image generation while the scan thread waits on the analysis
+_gemini_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="gemini")
+
+
+def _load_image_part(img_path: str) -> "types.Part":
+    """Read an image from disk and wrap it as an inline Gemini Part."""
+    with open(img_path, "rb") as f:
+        img_bytes = f.read()
+
+    # Determine MIME type based on file extension
+    mime_type = "image/png" if img_path.endswith(".png") else "image/jpeg"
+    return types.Part.from_bytes(data=img_bytes, mime_type=mime_type)
+
+
 def analyze_with_gemini(scan_dir: str, label: str) -> Optional[Dict[str, Any]]:
     """
     Analyze the 5 lighting condition images and texture scan data using Gemini API.
@@ -475,7 +868,7 @@ def analyze_with_gemini(scan_dir: str, label: str) -> Optional[Dict[str, Any]]:
             return None
 
         with open(texture_json_path, "r", encoding="utf-8") as f:
-            texture_data = json.load(f)
+            texture_data = json_loads(f.read())
 
         # Load the 5 lighting condition images from lighting schedule
         image_files = [_get_photo_filename(name) for _, name, _, _ in LIGHTING_SCHEDULE]
@@ -502,8 +895,8 @@ def analyze_with_gemini(scan_dir: str, label: str) -> Optional[Dict[str, Any]]:
 
         log.info("Analyzing %d images (5 lighting conditions + spectrogram) with Gemini API...", len(image_paths))
 
-        # Initialize Gemini client with API key
-        client = genai.Client(api_key=GEMINI_API_KEY)
+        # Shared Gemini client (created once per process)
+        client = _get_genai_client()
 
         # Prepare comprehensive texture data for the prompt
         audio_data = texture_data.get('audio', {})
@@ -529,7 +922,7 @@ def analyze_with_gemini(scan_dir: str, label: str) -> Optional[Dict[str, Any]]:
         prompt = f"""Given these images of a "{label}" captured under different lighting conditions (candlelight, warm indoor, neutral white, direct sunlight, and overcast), along with a texture spectrogram showing the frequency analysis of the piezo surface scan, analyze the material and predict its properties.
 
 Complete texture scan data:
-{json.dumps(texture_summary, indent=2)}
+{json_dumps(texture_summary, indent=True)}
 
 The spectrogram image shows the frequency domain analysis of the texture - analyze the patterns, energy distribution, and frequency characteristics to understand the material's surface properties.
 
@@ -616,22 +1009,11 @@ Provide ONLY valid JSON, no markdown formatting or additional text."""
         lighting_names = ["candlelight", "warm indoor", "neutral white", "direct sunlight", "overcast"]
         num_lighting_images = len(lighting_names)
         
-        for i, img_path in enumerate(image_paths):
-            # Read image as bytes and create Part
-            with open(img_path, "rb") as f:
-                img_bytes = f.read()
-            
-            # Determine MIME type based on file extension
-            if img_path.endswith('.png'):
-                mime_type = "image/png"
-            else:
-                mime_type = "image/jpeg"
-            
-            # Use types.Part.from_bytes for images
-            image_part = types.Part.from_bytes(
-                data=img_bytes,
-                mime_type=mime_type
-            )
+        # Read the images concurrently; map() keeps them in prompt order
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(image_paths)) as pool:
+            image_parts = list(pool.map(_load_image_part, image_paths))
+
+        for i, image_part in enumerate(image_parts):
             contents.append(image_part)
             
             # Add description based on image type
@@ -655,19 +1037,14 @@ Provide ONLY valid JSON, no markdown formatting or additional text."""
         elapsed_time = time.time() - start_time
 
         # Parse JSON response
-        response_text = response.text.strip()
+        response_text = response.text
         
-        # Remove markdown code blocks if present
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        response_text = response_text.strip()
+        # Remove markdown code fence if present
+        fence_match = _JSON_FENCE_RE.match(response_text)
+        response_text = fence_match.group(1) if fence_match else response_text.strip()
 
         try:
-            analysis_result = json.loads(response_text)
+            analysis_result = json_loads(response_text)
             log.info("Successfully parsed Gemini analysis result")
             
             # Extract and log key results
@@ -681,11 +1058,10 @@ Provide ONLY valid JSON, no markdown formatting or additional text."""
             log.error("Failed to parse Gemini response as JSON: %s", e)
             log.error("Response text: %s", response_text[:500])
             # Try to extract JSON from the response
-            import re
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+            json_match = _JSON_OBJECT_RE.search(response_text)
             if json_match:
                 try:
-                    analysis_result = json.loads(json_match.group(0))
+                    analysis_result = json_loads(json_match.group(0))
                     log.info("Extracted JSON from response")
                     return analysis_result
                 except json.JSONDecodeError:
@@ -717,10 +1093,6 @@ def generate_product_image(
         log.error("Gemini API not available for image generation")
         return None
 
-    if not PIL_AVAILABLE:
-        log.error("PIL/Pillow not available for image generation")
-        return None
-
     try:
         # Load candlelight photo (best exposure)
         candlelight_path = os.path.join(scan_dir, PHOTO_CANDLELIGHT)
@@ -730,8 +1102,8 @@ def generate_product_image(
 
         log.info("Generating product image using candlelight photo...")
         
-        # Initialize Gemini client
-        client = genai.Client(api_key=GEMINI_API_KEY)
+        # Shared Gemini client (created once per process)
+        client = _get_genai_client()
         
         # Build prompt using label and material analysis
         material_type = material_analysis.get("material_type", "textile")
@@ -746,8 +1118,8 @@ Generate a clean, high-quality product image that showcases the item in a profes
 with proper lighting and composition suitable for e-commerce or catalog use. 
 Maintain the authentic appearance and characteristics of the original item."""
 
-        # Load image using PIL
-        image = Image.open(candlelight_path)
+        # Send the JPEG bytes as-is rather than decoding/re-encoding via PIL
+        image = _load_image_part(candlelight_path)
         
         # Generate image
         start_time = time.time()
@@ -769,8 +1141,8 @@ Maintain the authentic appearance and characteristics of the original item."""
                 log.info("Image generation response text: %s", part.text)
             elif part.inline_data is not None:
                 try:
-                    generated_image = part.as_image()
-                    generated_image.save(generated_image_path)
+                    with open(generated_image_path, "wb") as f:
+                        f.write(part.inline_data.data)
                     image_saved = True
                     log.info("Generated product image saved to %s (took %.2f seconds)", 
                             GENERATED_PRODUCT_IMAGE, elapsed_time)
@@ -807,32 +1179,30 @@ def ingest_to_hardware_api(
         return False
 
     try:
-        # Read image as bytes
         if not os.path.exists(image_path):
             log.error("Image file not found: %s", image_path)
             return False
 
-        with open(image_path, "rb") as f:
-            image_bytes = f.read()
-
         log.info("Sending data to hardware API at %s/api/ingest", BASE_URL)
 
-        # Prepare form data
-        files = {
-            'image': (os.path.basename(image_path), image_bytes, 'image/png')
-        }
-        
-        data = {
-            'tactile_json': json.dumps(tactile_data)
-        }
+        # Not streamed: requests reads the whole file into the multipart body
+        # either way; passing the handle just leaves that read to requests
+        with open(image_path, "rb") as image_file:
+            files = {
+                'image': (os.path.basename(image_path), image_file, 'image/png')
+            }
 
-        # Make POST request
-        response = requests.post(
-            f"{BASE_URL}/api/ingest",
-            files=files,
-            data=data,
-            timeout=30
-        )
+            data = {
+                'tactile_json': json_dumpb(tactile_data)
+            }
+
+            # Make POST request
+            response = _HTTP.post(
+                f"{BASE_URL}/api/ingest",
+                files=files,
+                data=data,
+                timeout=30
+            )
 
         if response.status_code == 200:
             log.info("Successfully sent data to hardware API")
@@ -850,6 +1220,12 @@ def ingest_to_hardware_api(
         return False
 
 
+def _encode_grb(rgb: Tuple[int, int, int], brightness: float) -> bytes:
+    """Brightness-scaled pixel bytes for the whole ring in GRB wire order."""
+    r, g, b = (int(c * brightness) for c in rgb)
+    return bytes((g, r, b)) * NUM_PIXELS
+
+
 class Buzzer:
     """Hardware buzzer controller."""
     
@@ -863,13 +1239,15 @@ class Buzzer:
         self.pin = pin
         GPIO.setup(self.pin, GPIO.OUT)
         GPIO.output(self.pin, GPIO.LOW)
+        # Cue beeps play here so the scan doesn't sit in their sleeps; one
+        # worker keeps queued patterns in order and never overlapping
+        self._player = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="buzzer"
+        )
         log.info("Buzzer ready on GPIO%d", pin)
 
     def beep(self, duration: float = BEEP_DURATION) -> None:
         """Generate a single beep."""
-        if GPIO.getmode() is None:
-            GPIO.setmode(GPIO.BCM)
-
         GPIO.output(self.pin, GPIO.HIGH)
         time.sleep(duration)
         GPIO.output(self.pin, GPIO.LOW)
@@ -884,12 +1262,34 @@ class Buzzer:
         """Generate a long beep."""
         self.beep(self.LONG_BEEP_DURATION)
 
+    def play_async(self, pattern: Callable[[], None]) -> concurrent.futures.Future:
+        """Queue a beep pattern (e.g. `self.triple`) and return without waiting."""
+        return self._player.submit(pattern)
+
+    def close(self) -> None:
+        """Let queued beeps finish, then leave the pin low."""
+        self._player.shutdown(wait=True)
+        GPIO.output(self.pin, GPIO.LOW)
+
 
 class ScanController:
     def __init__(self):
-        self.status = ScanStatus()
         self._lock = threading.Lock()
+        self._publish_status(ScanStatus())
         self._busy = threading.Event()
+        # Set by a long press to abort the running scan at its next countdown
+        self._cancel = threading.Event()
+        # Label for the running scan, delivered by POST /scan/{scan_id}/label
+        self._pending_label: Optional[str] = None
+        self._label_ready = threading.Event()
+        # Set once on shutdown; no new scans start after it
+        self._stop = threading.Event()
+        self._scan_thread: Optional[threading.Thread] = None
+        self._last_click = 0.0
+
+        # Configure GPIO before other hardware initialization
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setwarnings(False)
 
         self.buzzer = Buzzer(BUZZER_PIN)
 
@@ -909,14 +1309,28 @@ class ScanController:
         self.pixels.fill((0, 0, 0))
         self.pixels.show()
 
+        # Finished SPI frames for each lighting color, encoded once
+        self._led_frames = self._build_led_frames()
+
+        # Audio processing, Gemini analysis, image generation and ingest of
+        # captured scans, one scan at a time
+        self._analysis_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="analysis"
+        )
+
         # Pi Camera
         self.cam = init_camera()
+        # JPEG encode + write of each photo overlaps the next LED settle
+        self._photo_writer = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="photo-writer"
+        )
 
         ensure_dir(SCAN_ROOT)
 
         # LCD
         self.lcd = JHD1802()
         self.lcd_lock = threading.Lock()
+        self._last_lcd: Optional[Tuple[str, str]] = None
 
         # optional boot message
         self.lcd_write("Texture scanner", "Ready...")
@@ -942,6 +1356,25 @@ class ScanController:
         
         # Small delay to let button thread finish current operation
         time.sleep(0.1)
+
+        # Abort any running scan at its next countdown and wait for its cleanup,
+        # so nothing is mid-call on the camera/LEDs when they're torn down
+        with self._lock:
+            self._stop.set()
+        self._request_cancel()
+        scan_thread = self._scan_thread
+        if scan_thread is not None and scan_thread.is_alive():
+            scan_thread.join(timeout=SHUTDOWN_JOIN_TIMEOUT)
+            if scan_thread.is_alive():
+                log.warning("Scan thread still running at shutdown")
+        self._photo_writer.shutdown(wait=True)
+        # Queued post-processing would only fail once the process is gone
+        self._analysis_pool.shutdown(wait=False, cancel_futures=True)
+        # Before GPIO.cleanup, so no queued beep touches a released pin
+        try:
+            self.buzzer.close()
+        except Exception as e:
+            log.debug("Buzzer shutdown: %s", e)
         
         # Stop camera cleanly
         try:
@@ -952,20 +1385,45 @@ class ScanController:
             log.warning("Camera stop failed: %s", e)
 
     def get_status(self) -> Dict[str, Any]:
-        with self._lock:
-            return asdict(self.status)
+        # No lock: writers swap in a new dict rather than mutating this one
+        return self._status_dict
+
+    def _publish_status(self, status: ScanStatus) -> None:
+        """Install a new status snapshot; callers other than __init__ hold _lock."""
+        self.status = status
+        # Built once per change instead of per poll. ScanStatus holds scalars
+        # plus a dict that is replaced rather than mutated, so a shallow copy of
+        # its fields is as safe as asdict() and cheaper.
+        self._status_dict = dict(vars(status))
 
     def lcd_write(self, line1: str, line2: str = "") -> None:
         try:
             l1, l2 = _fit_16(line1), _fit_16(line2)
             with self.lcd_lock:
-                self.lcd.setCursor(0, 0)
-                self.lcd.write(l1)
-                self.lcd.setCursor(1, 0)
-                self.lcd.write(l2)
+                # Countdowns repeat the same text; skip the I2C traffic
+                if (l1, l2) == self._last_lcd:
+                    return
+                old1, old2 = self._last_lcd or (None, None)
+                # Unknown display contents until both rows are rewritten
+                self._last_lcd = None
+                self._lcd_write_row(0, l1, old1)
+                self._lcd_write_row(1, l2, old2)
+                self._last_lcd = (l1, l2)
         except Exception as e:
             log.warning("LCD write failed: %s", e)
 
+    def _lcd_write_row(self, row: int, new: str, old: Optional[str]) -> None:
+        """Rewrite only the span of `row` that differs from what the LCD already shows."""
+        if old is None or len(old) != len(new):
+            start, end = 0, len(new)
+        else:
+            changed = [i for i, (a, b) in enumerate(zip(new, old)) if a != b]
+            if not changed:
+                return
+            start, end = changed[0], changed[-1] + 1
+        self.lcd.setCursor(row, start)
+        self.lcd.write(new[start:end])
+
 
     def lcd_step(self, step: str, detail: str = "") -> None:
         """Convenience wrapper for step/status display."""
@@ -974,19 +1432,28 @@ class ScanController:
 
     def start_scan(self) -> str:
         with self._lock:
+            if self._stop.is_set():
+                raise RuntimeError("Shutting down")
             if self._busy.is_set():
                 raise RuntimeError("Scan already in progress")
-            scan_id = time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:8]
-            self.status = ScanStatus(
+            scan_id = time.strftime("%Y%m%d-%H%M%S") + "-" + os.urandom(4).hex()
+            self._publish_status(ScanStatus(
                 state="ARMING",
                 scan_id=scan_id,
                 started_at=time.time(),
                 message="Arming scan...",
                 progress=0.05,
-            )
+                analysis=self.status.analysis,
+            ))
+            self._cancel.clear()
+            self._pending_label = None
+            self._label_ready.clear()
             self._busy.set()
 
+        # Created up front so the label can be posted as soon as the id is known
+        ensure_dir(os.path.join(SCAN_ROOT, scan_id))
         t = threading.Thread(target=self._run_scan, args=(scan_id,), daemon=True)
+        self._scan_thread = t
         t.start()
         return scan_id
 
@@ -994,8 +1461,17 @@ class ScanController:
         scan_dir = os.path.join(SCAN_ROOT, scan_id)
         if not os.path.isdir(scan_dir):
             raise FileNotFoundError("Unknown scan_id")
-        with open(os.path.join(scan_dir, METADATA_LABEL_JSON), "w", encoding="utf-8") as f:
-            json.dump(payload.model_dump(), f, indent=2)
+        write_json_atomic(os.path.join(scan_dir, METADATA_LABEL_JSON), payload.model_dump())
+        with self._lock:
+            # Hand the label to a scan that is still waiting for it
+            if self._busy.is_set() and self.status.scan_id == scan_id:
+                self._pending_label = payload.label
+                self._label_ready.set()
+
+    def _request_cancel(self) -> None:
+        """Abort the running scan at its next countdown or label wait."""
+        self._cancel.set()
+        self._label_ready.set()
 
     def _set_button_led(self, on: bool) -> None:
         """Set button LED state."""
@@ -1006,44 +1482,110 @@ class ScanController:
             log.warning("LED set error: %s", e)
 
     def _handle_button_event(self, index, code, t):
-        if GPIO.getmode() is None:
-            GPIO.setmode(GPIO.BCM)
-
+        # GPIO mode is set to BCM when the controller is built, before this
+        # callback is registered; no per-event query needed
         if code == NOISE:
             return
         if code & CLICK:
+            # Contact bounce can report several clicks for one press
+            now = time.monotonic()
+            if now - self._last_click < CLICK_DEBOUNCE_S:
+                return
+            self._last_click = now
             try:
                 self.start_scan()
             except RuntimeError:
                 pass
         elif code & LONGPRESS:
+            if self._busy.is_set():
+                log.info("Long press: cancelling scan")
+                self._request_cancel()
             self._set_button_led(False)
 
     def _ring_off(self):
-        self.pixels.brightness = 0.0
-        self.pixels.fill((0, 0, 0))
+        self._ring_show(RING_OFF, 0.0, self._led_frames.get(RING_OFF))
+
+    def _ring_show(self, rgb: Tuple[int, int, int], brightness: float, frame: Optional[bytes]) -> None:
+        """Fill the ring with one color, sending the cached `frame` if given instead of show()."""
+        # The pixel buffer is kept in step even when the frame goes out directly,
+        # so a later show() can't bring back a stale color
+        self.pixels.brightness = brightness
+        self.pixels.fill(rgb)
+        if frame is not None:
+            try:
+                with self.pixels._spi as spi:
+                    spi.write(frame)
+                return
+            except Exception as e:
+                log.warning("Cached ring frame write failed (%s); using fill/show", e)
+                self._led_frames = {}
         self.pixels.show()
 
+    def _build_led_frames(self) -> Dict[Tuple[int, int, int], bytes]:
+        """
+        Pre-render the SPI bytes NeoPixel_SPI would send for each lighting color
+        and for the ring turned off.
+        
+        Uses the driver's own bit expansion, so a color change becomes one SPI
+        write with no per-pixel fill or per-bit loop.
+        
+        Returns:
+            Frame bytes keyed by RGB, or {} if the driver internals don't match
+        """
+        frames = {}
+        try:
+            for rgb in [RING_OFF] + [rgb for rgb, _, _, _ in LIGHTING_SCHEDULE]:
+                self.pixels._transmogrify(_encode_grb(rgb, MAX_BRIGHTNESS))
+                frames[rgb] = self.pixels._reset + bytes(self.pixels._spibuf) + self.pixels._reset
+        except Exception as e:
+            # Private driver API: any mismatch just disables the cache
+            log.warning("NeoPixel_SPI frame caching unavailable (%s); using fill/show", e)
+            return {}
+        return frames
+
     def _ring_set(self, rgb: Tuple[int, int, int], brightness: float = MAX_BRIGHTNESS) -> None:
         """Set ring light color and brightness."""
-        self.pixels.brightness = clamp(brightness, 0.0, MAX_BRIGHTNESS)
-        self.pixels.fill(rgb)
-        self.pixels.show()
+        frame = self._led_frames.get(rgb) if brightness == MAX_BRIGHTNESS else None
+        self._ring_show(rgb, clamp(brightness, 0.0, MAX_BRIGHTNESS), frame)
 
     def _update_status(self, state: str, message: str, progress: float) -> None:
         """Update scan status."""
         with self._lock:
-            self.status.state = state
-            self.status.message = message
-            self.status.progress = progress
-
-    def _prompt_for_label(self, scan_id: str, scan_dir: str) -> str:
-        """Prompt user for item label and save it."""
-        self._update_status("LABEL", "Waiting for terminal label...", 0.05)
-        self.lcd_step("Enter label", "in terminal...")
+            self._publish_status(replace(self.status, state=state, message=message, progress=progress))
+
+    def _set_analysis_state(self, scan_id: str, state: str) -> None:
+        """Update the analysis status of `scan_id`, leaving other scans' entries alone."""
+        with self._lock:
+            analysis = dict(self.status.analysis)
+            analysis[scan_id] = state
+            # Keep every scan still queued or in progress, plus the latest finished ones
+            finished = [sid for sid, st in analysis.items() if st in ANALYSIS_FINISHED_STATES]
+            for sid in finished[:-ANALYSIS_HISTORY]:
+                del analysis[sid]
+            self._publish_status(replace(self.status, analysis=analysis))
+
+    def _analysis_lcd_step(self, step: str, detail: str = "") -> None:
+        """Show analysis progress, unless a newer scan is using the LCD."""
+        if not self._busy.is_set():
+            self.lcd_step(step, detail)
+
+    def _wait_for_label(self, scan_id: str, scan_dir: str) -> str:
+        """
+        Wait for the item label to arrive via POST /scan/{scan_id}/label and save it.
         
-        log.info("Prompting for label in terminal...")
-        label = input(f"[{scan_id}] Enter item label: ").strip()
+        Raises:
+            ScanCancelled: If the scan is cancelled while waiting
+        """
+        self._update_status("LABEL", "Waiting for label...", 0.05)
+        self.lcd_step("Enter label", "via app...")
+        
+        log.info("Waiting up to %ds for POST /scan/%s/label", LABEL_TIMEOUT_S, scan_id)
+        if not self._label_ready.wait(timeout=LABEL_TIMEOUT_S):
+            log.warning("No label received; continuing unlabeled")
+        if self._cancel.is_set():
+            raise ScanCancelled("Scan cancelled")
+        with self._lock:
+            label = (self._pending_label or "").strip()
         if not label:
             label = "unlabeled"
         log.info("Label = %r", label)
@@ -1056,121 +1598,179 @@ class ScanController:
         
         return label
 
+    def _countdown(self, step: str, detail_fmt: str, seconds: int) -> None:
+        """
+        Show a per-second countdown on the LCD.
+        
+        Waits on the cancel event rather than sleeping, so a long press ends it
+        immediately.
+        
+        Raises:
+            ScanCancelled: If the scan is cancelled before the countdown ends
+        """
+        deadline = time.monotonic() + seconds
+        while (remaining := deadline - time.monotonic()) > 0:
+            self.lcd_step(step, detail_fmt.format(math.ceil(remaining)))
+            if self._cancel.wait(timeout=min(1.0, remaining)):
+                raise ScanCancelled("Scan cancelled")
+
     def _wait_for_positioning(self) -> None:
         """Wait for user to position item."""
         self._update_status("POSITION", "Position item (3s)...", 0.10)
         log.info("Waiting %d seconds for user to position item...", POSITION_ITEM_COUNTDOWN)
-        for i in range(POSITION_ITEM_COUNTDOWN, 0, -1):
-            self.lcd_step("Position item", f"starting in {i}")
-            time.sleep(1.0)
+        self._countdown("Position item", "starting in {}", POSITION_ITEM_COUNTDOWN)
 
-    def _capture_photos(self, scan_dir: str) -> Dict[str, str]:
-        """Capture photos under different lighting conditions."""
+    def _prewarm_camera(self) -> None:
+        """Light the first color and let AE/AWB/AF converge while the item is positioned."""
+        self._ring_set(LIGHTING_SCHEDULE[0][0], brightness=MAX_BRIGHTNESS)
+        # Continuous AF tracks the item as it is being placed
+        self.cam.set_controls({
+            "AeEnable": True,
+            "AwbEnable": True,
+            "AfMode": controls.AfModeEnum.Continuous,
+        })
+
+    def _capture_photos(self, scan_dir: str, prewarmed: bool = False) -> Dict[str, str]:
+        """
+        Capture photos under different lighting conditions.
+
+        With `prewarmed`, the ring is already on the first color and the camera
+        has converged on it, so the first photo skips the LED and exposure settle.
+        """
         self._update_status("IMAGES", "Capturing images under 5 lights...", 0.25)
-        self.buzzer.triple()
+        self.buzzer.play_async(self.buzzer.triple)
         
         # Freeze exposure after initial settle
         self.cam.set_controls({"AeEnable": False})
 
-        # Build photo metadata map
-        photo_meta_map = {
-            _get_photo_filename(name): _get_photo_meta_filename(name)
-            for _, name, _, _ in LIGHTING_SCHEDULE
-        }
-
         self.lcd_step("Taking photos", "5 lighting conds")
         captured_images = {}
+        photo_meta = {}
+        pending_saves = []
+        # Focus once on the first photo; the item stays put for the rest
+        lens_position = None
+
+        # The ring for photo i+1 is switched as soon as photo i's frame is in,
+        # so its settle runs alongside the JPEG encode
+        if not prewarmed:
+            self._ring_set(LIGHTING_SCHEDULE[0][0], brightness=MAX_BRIGHTNESS)
+        ring_set_at = None if prewarmed else time.monotonic()
         
-        for rgb, name, display_name, temp_k in LIGHTING_SCHEDULE:
+        for i, (rgb, name, display_name, temp_k) in enumerate(LIGHTING_SCHEDULE):
             filename = _get_photo_filename(name)
             log.info("Ring -> %s (%s) [%dK]", name, rgb, temp_k)
             
-            self._ring_set(rgb, brightness=MAX_BRIGHTNESS)
-            time.sleep(LED_COLOR_SETTLE_TIME)
+            settled = ring_set_at is None
+            if not settled:
+                time.sleep(max(0.0, LED_COLOR_SETTLE_TIME - (time.monotonic() - ring_set_at)))
 
             self.lcd_step("Photo", name)
             img_path = os.path.join(scan_dir, filename)
-            md, lock = capture_locked(self.cam, img_path)
+            md, lock, saved = capture_locked(
+                self.cam,
+                img_path,
+                settle_s=0.0 if settled else EXPOSURE_SETTLE_TIME,
+                writer=self._photo_writer,
+                lens_position=lens_position,
+                stream="main" if name == HERO_PHOTO_NAME else "lores",
+            )
+            if i + 1 < len(LIGHTING_SCHEDULE):
+                self._ring_set(LIGHTING_SCHEDULE[i + 1][0], brightness=MAX_BRIGHTNESS)
+                ring_set_at = time.monotonic()
+            pending_saves.append(saved)
+            lens_position = lock.get("LensPosition")
+
+            # Frame metadata is plain numbers and tuples, which the serializer
+            # takes as-is; only the lock holds enums that json_safe must name
+            photo_meta[name] = {"metadata": md, "lock": json_safe(lock)}
+            captured_images[name] = filename
 
-            # Save metadata
-            try:
-                meta_filename = photo_meta_map[filename]
-                meta_path = os.path.join(scan_dir, meta_filename)
-                with open(meta_path, "w", encoding="utf-8") as f:
-                    json.dump(json_safe({"metadata": md, "lock": lock}), f, indent=2)
-            except Exception as e:
-                log.warning("Failed to write metadata JSON: %s", e)
+        # One metadata file for the whole set, written behind the last encode
+        self._photo_writer.submit(
+            write_photo_metadata, os.path.join(scan_dir, PHOTO_METADATA_JSON), photo_meta
+        )
 
-            captured_images[name] = filename
-            time.sleep(PHOTO_CAPTURE_DELAY)
+        # Surface any encode/write failure before the photos are used
+        for saved in pending_saves:
+            saved.result()
 
         self.cam.set_controls({"AeEnable": True})
         return captured_images
 
-    def _record_texture_audio(self, scan_dir: str) -> str:
+    def _record_texture_audio(self) -> np.ndarray:
         """Record texture audio using piezo sensor."""
-        self.buzzer.triple()
+        self.buzzer.play_async(self.buzzer.triple)
         self._ring_off()
         self.lcd_step("Texture mode", "get ready")
 
         log.info("Beep: texture starts in %d seconds", TEXTURE_COUNTDOWN)
-        self.buzzer.triple()
-        for i in range(TEXTURE_COUNTDOWN, 0, -1):
-            self.lcd_step("Texture in", f"{i} sec")
-            time.sleep(1.0)
+        self.buzzer.play_async(self.buzzer.triple)
+        self._countdown("Texture in", "{} sec", TEXTURE_COUNTDOWN)
 
         log.info("Beep: START texture audio capture (%ds)", TEXTURE_RECORDING_DURATION)
-        self.buzzer.long()
+        # Blocking on purpose: the piezo would pick up the tone (and any cue
+        # still queued) if recording started before it ends
+        self.buzzer.play_async(self.buzzer.long).result()
 
         self._update_status("TEXTURE", f"Recording texture audio ({TEXTURE_RECORDING_DURATION}s)...", 0.70)
         
-        audio_raw = os.path.join(scan_dir, AUDIO_TEXTURE_RAW)
-        record_audio_wav(audio_raw, TEXTURE_RECORDING_DURATION)
+        raw_pcm = record_audio_pcm(TEXTURE_RECORDING_DURATION)
         
         log.info("Beep: texture capture done")
-        self.buzzer.long()
+        self.buzzer.play_async(self.buzzer.long)
         
-        return audio_raw
+        return raw_pcm
 
-    def _process_audio(self, audio_raw: str, scan_dir: str) -> Tuple[Dict[str, Any], bool]:
-        """Process audio: DC removal, normalization, spectrogram."""
-        self._update_status("PROCESSING", "Post-processing audio...", 0.85)
-        
+    def _process_audio(self, raw_pcm: np.ndarray, scan_dir: str) -> Tuple[Dict[str, Any], bool]:
+        """Process audio in memory: DC removal, normalization, spectrogram."""
+        audio_raw = os.path.join(scan_dir, AUDIO_TEXTURE_RAW)
         audio_nodc = os.path.join(scan_dir, AUDIO_TEXTURE_NODC)
         audio_norm = os.path.join(scan_dir, AUDIO_TEXTURE_NORM)
         spec_png = os.path.join(scan_dir, TEXTURE_SPECTROGRAM)
 
+        raw = pcm_to_float(raw_pcm)
+        write_wav(audio_raw, raw_pcm)
+
         # DC removal
-        self.lcd_step("Processing", "DC remove")
-        sox_dc_log = sox_remove_dc(audio_raw, audio_nodc)
+        self._analysis_lcd_step("Processing", "DC remove")
+        nodc = remove_dc(raw)
+        write_wav(audio_nodc, float_to_pcm(nodc))
 
-        raw_stats = sox_stat(audio_raw)
+        raw_stats = audio_stats(raw)
         log.info("RAW  RMS=%s MAX=%s MID=%s",
-            get_stat(raw_stats["parsed"], "RMS amplitude"),
-            get_stat(raw_stats["parsed"], "Maximum amplitude"),
-            get_stat(raw_stats["parsed"], "Midline amplitude"))
+            raw_stats["parsed"].get("RMS amplitude"),
+            raw_stats["parsed"].get("Maximum amplitude"),
+            raw_stats["parsed"].get("Midline amplitude"))
 
-        nodc_stats = sox_stat(audio_nodc)
+        nodc_stats = audio_stats(nodc)
         log.info("NODC RMS=%s MAX=%s MID=%s",
-            get_stat(nodc_stats["parsed"], "RMS amplitude"),
-            get_stat(nodc_stats["parsed"], "Maximum amplitude"),
-            get_stat(nodc_stats["parsed"], "Midline amplitude"))
+            nodc_stats["parsed"].get("RMS amplitude"),
+            nodc_stats["parsed"].get("Maximum amplitude"),
+            nodc_stats["parsed"].get("Midline amplitude"))
 
         # Normalization
-        self.lcd_step("Processing", "normalize")
-        sox_norm_log = sox_normalize(audio_nodc, audio_norm)
-
-        norm_stats = sox_stat(audio_norm)
+        self._analysis_lcd_step("Processing", "normalize")
+        # Normalization is a pure gain, so its stats follow from the NODC ones
+        nodc_parsed = nodc_stats["parsed"]
+        gain = peak_gain(max(nodc_parsed.get("Maximum amplitude", 0.0),
+                             -nodc_parsed.get("Minimum amplitude", 0.0)))
+        norm = nodc * gain
+        write_wav(audio_norm, float_to_pcm(norm))
+
+        norm_stats = scale_audio_stats(nodc_stats, gain)
         log.info("NORM RMS=%s MAX=%s MID=%s",
-            get_stat(norm_stats["parsed"], "RMS amplitude"),
-            get_stat(norm_stats["parsed"], "Maximum amplitude"),
-            get_stat(norm_stats["parsed"], "Midline amplitude"))
+            norm_stats["parsed"].get("RMS amplitude"),
+            norm_stats["parsed"].get("Maximum amplitude"),
+            norm_stats["parsed"].get("Midline amplitude"))
 
         # Spectrogram
         spec_ok = True
         try:
-            self.lcd_step("Processing", "spectrogram")
-            sox_spectrogram(audio_nodc, spec_png)
+            self._analysis_lcd_step("Processing", "spectrogram")
+            if PIL_AVAILABLE:
+                render_spectrogram(nodc, spec_png)
+            else:
+                sox_spectrogram(audio_nodc, spec_png)
         except Exception:
             spec_ok = False
             log.warning("Spectrogram failed (continuing)")
@@ -1182,8 +1782,6 @@ class ScanController:
             "norm_wav": os.path.basename(audio_norm),
             "spectrogram_png": os.path.basename(spec_png) if spec_ok else None,
             "arecord_log": "",  # arecord doesn't return output
-            "sox_dc_log": sox_dc_log,
-            "sox_norm_log": sox_norm_log,
             "stats_raw": raw_stats,
             "stats_nodc": nodc_stats,
             "stats_norm": norm_stats,
@@ -1207,52 +1805,78 @@ class ScanController:
             "images": captured_images,
         }
 
-        texture_json_path = os.path.join(scan_dir, TEXTURE_SCAN_JSON)
-        with open(texture_json_path, "w", encoding="utf-8") as f:
-            json.dump(results, f, indent=2)
+        write_json_atomic(os.path.join(scan_dir, TEXTURE_SCAN_JSON), results)
         
         return results
 
-    def _run_gemini_analysis(self, scan_dir: str, label: str, results: Dict[str, Any]) -> None:
-        """Run Gemini API analysis and save final results."""
-        self._update_status("ANALYZING", "Gemini AI analysis...", 0.90)
-        self.lcd_step("AI Analysis", "Gemini...")
+    def _run_postprocess(
+        self,
+        scan_id: str,
+        scan_dir: str,
+        label: str,
+        captured_images: Dict[str, str],
+        raw_pcm: np.ndarray,
+    ) -> None:
+        """Process audio, save scan results and run Gemini analysis (on _analysis_pool)."""
+        try:
+            self._set_analysis_state(scan_id, "PROCESSING")
+            audio_data, _ = self._process_audio(raw_pcm, scan_dir)
+            results = self._save_scan_results(scan_dir, scan_id, label, captured_images, audio_data)
+            self._analyze_scan(scan_dir, label, results)
+            self._set_analysis_state(scan_id, "DONE")
+        except Exception:
+            self._set_analysis_state(scan_id, "FAILED")
+            log.exception("Post-processing failed for %s", scan_id)
+        self._analysis_lcd_step("Idle", "Ready")
+
+    def _analyze_scan(self, scan_dir: str, label: str, results: Dict[str, Any]) -> None:
+        """Gemini analysis, product image generation and hardware API ingest."""
+        scan_id = results["scan_id"]
+        self._set_analysis_state(scan_id, "ANALYZING")
+        self._analysis_lcd_step("AI Analysis", "Gemini...")
         log.info("Starting Gemini analysis...")
+
+        image_future = None
+        if GEMINI_OVERLAP_IMAGE_GENERATION:
+            log.info("Starting product image generation alongside analysis...")
+            image_future = _gemini_pool.submit(generate_product_image, scan_dir, label, {})
         
         gemini_analysis = analyze_with_gemini(scan_dir, label)
         
         if gemini_analysis:
             # Only save the Gemini analysis, not the full texture_scan data
             final_results = {
-                "scan_id": results["scan_id"],
+                "scan_id": scan_id,
                 "label": label,
                 "material_analysis": gemini_analysis,
             }
-            
             final_results_path = os.path.join(scan_dir, RESULTS_FINAL_JSON)
-            with open(final_results_path, "w", encoding="utf-8") as f:
-                json.dump(final_results, f, indent=2)
             
-            log.info("Saved %s with Gemini analysis", RESULTS_FINAL_JSON)
-            self.lcd_step("Analysis done", "Saved")
+            log.info("Gemini analysis complete")
+            self._analysis_lcd_step("Analysis done", "")
             
             # Generate product image after analysis completes
-            self._update_status("GENERATING", "Creating product image...", 0.95)
-            self.lcd_step("Product image", "Generating...")
-            log.info("Starting product image generation...")
-            
-            generated_image_path = generate_product_image(scan_dir, label, gemini_analysis)
+            self._set_analysis_state(scan_id, "GENERATING")
+            self._analysis_lcd_step("Product image", "Generating...")
+            if image_future is not None:
+                log.info("Waiting for product image generation...")
+                generated_image_path = image_future.result()
+            else:
+                log.info("Starting product image generation...")
+                generated_image_path = generate_product_image(scan_dir, label, gemini_analysis)
             if generated_image_path:
                 # Add generated image reference to final results
                 final_results["generated_product_image"] = GENERATED_PRODUCT_IMAGE
-                with open(final_results_path, "w", encoding="utf-8") as f:
-                    json.dump(final_results, f, indent=2)
+            # Written once, with or without the image reference
+            write_json_atomic(final_results_path, final_results)
+            log.info("Saved %s with Gemini analysis", RESULTS_FINAL_JSON)
+            if generated_image_path:
                 log.info("Product image generation completed")
-                self.lcd_step("Image done", "Complete")
+                self._analysis_lcd_step("Image done", "Complete")
                 
                 # Send to hardware API
-                self._update_status("INGESTING", "Sending to API...", 0.98)
-                self.lcd_step("API Upload", "Sending...")
+                self._set_analysis_state(scan_id, "INGESTING")
+                self._analysis_lcd_step("API Upload", "Sending...")
                 log.info("Sending data to hardware API...")
                 
                 # Extract tactile_data from material analysis
@@ -1264,16 +1888,25 @@ class ScanController:
                 
                 if ingest_to_hardware_api(generated_image_path, tactile_payload):
                     log.info("Successfully sent data to hardware API")
-                    self.lcd_step("API done", "Complete")
+                    self._analysis_lcd_step("API done", "Complete")
                 else:
                     log.warning("Failed to send data to hardware API, continuing")
-                    self.lcd_step("API failed", "Continue")
+                    self._analysis_lcd_step("API failed", "Continue")
             else:
                 log.warning("Product image generation failed, continuing without it")
-                self.lcd_step("Image skipped", "Continue")
+                self._analysis_lcd_step("Image skipped", "Continue")
         else:
             log.warning("Gemini analysis failed, continuing without it")
-            self.lcd_step("Analysis skipped", "Continue")
+            self._analysis_lcd_step("Analysis skipped", "Continue")
+            if image_future is not None and not image_future.cancel():
+                # Already running: let it finish, then drop the image, since
+                # no results file will reference it
+                orphan = image_future.result()
+                if orphan:
+                    try:
+                        os.remove(orphan)
+                    except OSError as e:
+                        log.warning("Failed to remove unused product image: %s", e)
 
     def _run_scan(self, scan_id: str) -> None:
         """Main scan workflow orchestrator."""
@@ -1287,30 +1920,34 @@ class ScanController:
             self._set_button_led(True)
             
             # Step 1: Get label from user
-            label = self._prompt_for_label(scan_id, scan_dir)
+            label = self._wait_for_label(scan_id, scan_dir)
             
-            # Step 2: Wait for positioning
+            # Step 2: Wait for positioning (camera converges meanwhile)
+            self._prewarm_camera()
             self._wait_for_positioning()
             
             # Step 3: Capture photos under different lighting
-            captured_images = self._capture_photos(scan_dir)
+            captured_images = self._capture_photos(scan_dir, prewarmed=True)
             
             # Step 4: Record texture audio
-            audio_raw = self._record_texture_audio(scan_dir)
-            
-            # Step 5: Process audio
-            audio_data, _ = self._process_audio(audio_raw, scan_dir)
+            raw_pcm = self._record_texture_audio()
             
-            # Step 6: Save scan results
-            results = self._save_scan_results(scan_dir, scan_id, label, captured_images, audio_data)
-            
-            # Step 7: Run Gemini analysis
-            self._run_gemini_analysis(scan_dir, label, results)
+            # Steps 5-7: audio processing, scan results and Gemini analysis run
+            # in the background; the rig is free as soon as capture is done
+            self._set_analysis_state(scan_id, "PENDING")
+            self._analysis_pool.submit(
+                self._run_postprocess, scan_id, scan_dir, label, captured_images, raw_pcm
+            )
 
-            self._update_status("DONE", "Scan complete", 1.0)
+            self._update_status("DONE", "Scan captured", 1.0)
             log.info("=== SCAN DONE %s ===", scan_id)
             self.lcd_step("Done", label[:16])
 
+        except ScanCancelled as e:
+            self._update_status("CANCELLED", str(e), 1.0)
+            log.info("=== SCAN CANCELLED %s ===", scan_id)
+            self.lcd_step("Cancelled", "")
+
         except Exception as e:
             self._update_status("ERROR", str(e), 1.0)
             log.exception("=== SCAN ERROR %s ===", scan_id)
@@ -1320,20 +1957,26 @@ class ScanController:
             self._set_button_led(False)
             self._busy.clear()
             log.info("Cleanup complete; back to IDLE")
-            with self._lock:
-                last_id = self.status.scan_id
-                last_msg = self.status.message
-            time.sleep(0.2)
             self.lcd_step("Idle", "Ready")
             with self._lock:
-                self.status.state = "IDLE"
-                self.status.scan_id = last_id
-                self.status.message = last_msg
-                self.status.progress = 0.0
+                # A new scan may already have started once _busy was cleared
+                if self.status.scan_id == scan_id:
+                    self._publish_status(replace(self.status, state="IDLE", progress=0.0))
+
 
+@app.on_event("startup")
+async def start_controller():
+    # Built here rather than at import so importing the module doesn't touch
+    # the camera/GPIO, and init failures surface through the lifespan.
+    # The camera warmup blocks, so keep it off the event loop.
+    global _controller
+    _controller = await anyio.to_thread.run_sync(ScanController)
 
-controller = ScanController()
-_controller = controller
+
+def _get_controller() -> ScanController:
+    if _controller is None:
+        raise HTTPException(status_code=503, detail="Scanner not ready")
+    return _controller
 
 # Register cleanup handler
 def _atexit_cleanup():
@@ -1343,12 +1986,11 @@ def _atexit_cleanup():
         if _controller is not None:
             _controller.shutdown()
         
-        # Small delay to let threads finish
-        time.sleep(0.2)
-        
-        # Then cleanup GPIO (button thread may still try to access, but that's expected)
+        # Then cleanup GPIO (button thread may still try to access, but that's expected).
+        # No mode means ScanController never got as far as configuring GPIO.
         try:
-            GPIO.cleanup()
+            if GPIO.getmode() is not None:
+                GPIO.cleanup()
         except Exception as e:
             # Expected: button thread may try to access GPIO after cleanup
             # This is harmless and can be ignored
@@ -1360,34 +2002,49 @@ def _atexit_cleanup():
 atexit.register(_atexit_cleanup)
 
 @app.get("/scan/status")
-def scan_status():
-    return controller.get_status()
+async def scan_status():
+    # get_status never blocks (lock-free snapshot), so answer on the event loop
+    # rather than queueing behind the threadpool a sync handler would use
+    return _get_controller().get_status()
 
 
 @app.post("/scan/start")
 def scan_start():
     try:
-        scan_id = controller.start_scan()
+        scan_id = _get_controller().start_scan()
         return {"ok": True, "scan_id": scan_id}
     except RuntimeError as e:
         raise HTTPException(status_code=409, detail=str(e))
 
 
 @app.post("/scan/{scan_id}/label")
-def scan_label(scan_id: str, payload: LabelPayload):
+async def scan_label(scan_id: str, payload: LabelPayload):
+    # Only the file write needs a worker thread; validation stays on the loop
     try:
-        controller.label_scan(scan_id, payload)
+        await anyio.to_thread.run_sync(_get_controller().label_scan, scan_id, payload)
         return {"ok": True}
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="scan_id not found")
 
 
 @app.get("/health")
-def health():
+async def health():
     return {"status": "ok"}
 
 
 if __name__ == "__main__":
     import uvicorn
     # Now `python texture_server.py` will actually run the server.
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
+    # Single worker only: the controller owns the camera, GPIO and SPI, which
+    # can't be shared between processes.
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        log_level="info",
+        loop="uvloop",
+        http="httptools",
+        workers=1,
+        # Status polling would otherwise log a line per request
+        access_log=False,
+    )